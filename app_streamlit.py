@@ -7,15 +7,22 @@ Run with: streamlit run app_streamlit.py
 """
 
 import streamlit as st
+import numpy as np
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 from pathlib import Path
+import io
+import json
+import os
 import sys
+import tempfile
 
 # Add parent directory to path
 sys.path.insert(0, str(Path(__file__).parent))
-from extract_glp1_coverage import GLP1CoverageExtractor
+from extract_glp1_coverage import (
+    COST_FILE, COVERAGE_VERSION, FORMULARY_FILE, PLAN_INFO_FILE, GLP1CoverageExtractor
+)
 
 # Page config
 st.set_page_config(
@@ -25,6 +32,212 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+# Plan Lookup Tool display columns
+LOOKUP_COLUMNS = [
+    'plan_name', 'product_name', 'tier',
+    'prior_auth', 'step_therapy', 'quantity_limit',
+    'retail_preferred_cost', 'access_score'
+]
+
+# Persisted demo extraction (see load_demo); the version in the name means
+# a bumped COVERAGE_VERSION never reads an older file
+DEMO_PARQUET_FILE = f"coverage.v{COVERAGE_VERSION}.parquet"
+
+# Cached data loading and analytics
+# Streamlit reruns the whole script on every widget change; these are
+# memoized on their arguments so reruns reuse the previous results.
+
+@st.cache_data
+def load_demo(data_dir: str, source_mtime: float) -> pd.DataFrame:
+    """
+    Extract coverage from the bundled demo files
+    
+    The merged result is persisted to Parquet next to the demo files and
+    read back on later loads while it is newer than the sources and was
+    written by the current COVERAGE_VERSION. source_mtime (latest source
+    modification time) is part of the cache key so edited demo files are
+    re-extracted. An unreadable file is treated as missing and rewritten.
+    """
+    parquet_path = Path(data_dir) / DEMO_PARQUET_FILE
+    if parquet_path.exists() and parquet_path.stat().st_mtime >= source_mtime:
+        try:
+            return pd.read_parquet(parquet_path)
+        except (OSError, ValueError):
+            pass  # Truncated or corrupt (ArrowInvalid is a ValueError)
+    
+    extractor = GLP1CoverageExtractor(Path(data_dir))
+    coverage = extractor.extract_coverage()
+    
+    # Write to a temp file and swap it in, so readers (or a crash mid-write)
+    # never see a partial Parquet file
+    tmp_path = None
+    try:
+        fd, tmp_path = tempfile.mkstemp(
+            dir=parquet_path.parent, prefix=parquet_path.name, suffix='.tmp'
+        )
+        os.close(fd)
+        os.chmod(tmp_path, 0o644)  # mkstemp creates the file owner-only
+        coverage.to_parquet(tmp_path, compression='zstd', index=False)
+        os.replace(tmp_path, parquet_path)
+    except OSError:
+        # Read-only deployment: re-extract on the next cold start
+        if tmp_path and os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return coverage
+
+
+@st.cache_data
+def load_uploaded(plan_bytes: bytes, formulary_bytes: bytes, cost_bytes: bytes) -> pd.DataFrame:
+    """Extract coverage from uploaded CMS file contents (parsed in memory, in-process)"""
+    extractor = GLP1CoverageExtractor({
+        PLAN_INFO_FILE: io.BytesIO(plan_bytes),
+        FORMULARY_FILE: io.BytesIO(formulary_bytes),
+        COST_FILE: io.BytesIO(cost_bytes),
+    })
+    return extractor.extract_coverage()
+
+
+@st.cache_data
+def product_metrics(df: pd.DataFrame) -> pd.DataFrame:
+    """Plans, access score, PA and ST rates per product in one groupby pass"""
+    stats = df.groupby('product_name', observed=True).agg(
+        plans=('plan_id', 'count'),
+        access=('access_score', 'mean'),
+        pa_rate=('prior_auth', 'mean'),
+        st_rate=('step_therapy', 'mean'),
+    )
+    stats[['pa_rate', 'st_rate']] *= 100
+    return stats
+
+
+@st.cache_data
+def product_stats(df: pd.DataFrame) -> pd.DataFrame:
+    """Product comparison table"""
+    stats = product_metrics(df).round(1)
+    stats.columns = ['Plans Covering', 'Avg Access Score', 'PA Rate (%)', 'ST Rate (%)']
+    return stats.sort_values('Avg Access Score', ascending=False)
+
+
+@st.cache_data
+def pa_rates(df: pd.DataFrame) -> pd.DataFrame:
+    """Prior authorization rate per product"""
+    pa_data = product_metrics(df)['pa_rate'].reset_index()
+    pa_data.columns = ['Product', 'PA Rate (%)']
+    return pa_data
+
+
+@st.cache_data
+def st_rates(df: pd.DataFrame) -> pd.DataFrame:
+    """Step therapy rate per product"""
+    st_data = product_metrics(df)['st_rate'].reset_index()
+    st_data.columns = ['Product', 'ST Rate (%)']
+    return st_data
+
+
+@st.cache_data
+def tier_distribution(df: pd.DataFrame) -> pd.DataFrame:
+    """Coverage record count per product and tier"""
+    counts = df.value_counts(['product_name', 'tier'], sort=False)
+    # Categorical keys yield every product x tier pair; keep observed ones
+    return counts[counts > 0].sort_index().reset_index(name='count')
+
+
+@st.cache_data
+def org_stats(df: pd.DataFrame) -> pd.DataFrame:
+    """Top 10 organizations by coverage records"""
+    stats = df.groupby('organization_name', observed=True).agg(
+        records=('plan_id', 'count'),
+        access=('access_score', 'mean'),
+        pa_rate=('prior_auth', 'mean'),
+    )
+    stats['pa_rate'] *= 100
+    stats = stats.round(1)
+    
+    stats.columns = ['Coverage Records', 'Avg Access Score', 'PA Rate (%)']
+    return stats.sort_values('Coverage Records', ascending=False).head(10)
+
+
+@st.cache_data
+def filter_coverage(df: pd.DataFrame, selected_org: str, selected_product: str) -> pd.DataFrame:
+    """Plan Lookup Tool rows, best access first ('All' disables a selector)"""
+    mask = np.ones(len(df), dtype=bool)
+    if selected_org != 'All':
+        mask &= (df['organization_name'] == selected_org).to_numpy()
+    if selected_product != 'All':
+        mask &= (df['product_name'] == selected_product).to_numpy()
+    return df.loc[mask, LOOKUP_COLUMNS].sort_values('access_score', ascending=False)
+
+
+# Cached chart builders (px.* figure construction is the slow part)
+
+@st.cache_data
+def build_access_chart(product_summary: pd.DataFrame) -> go.Figure:
+    """Average access score by product"""
+    fig = px.bar(
+        product_summary.reset_index(),
+        x='product_name',
+        y='Avg Access Score',
+        color='Avg Access Score',
+        color_continuous_scale='RdYlGn',
+        title='Average Access Score by Product',
+        labels={'product_name': 'Product', 'Avg Access Score': 'Access Score (0-100)'}
+    )
+    fig.update_layout(showlegend=False, height=400)
+    return fig
+
+
+@st.cache_data
+def build_pa_chart(pa_data: pd.DataFrame) -> go.Figure:
+    """Prior authorization rates by product"""
+    fig = px.bar(
+        pa_data,
+        x='Product',
+        y='PA Rate (%)',
+        color='PA Rate (%)',
+        color_continuous_scale='Reds',
+        title='Prior Authorization Rates'
+    )
+    fig.update_layout(showlegend=False, height=350)
+    return fig
+
+
+@st.cache_data
+def build_st_chart(st_data: pd.DataFrame) -> go.Figure:
+    """Step therapy rates by product"""
+    fig = px.bar(
+        st_data,
+        x='Product',
+        y='ST Rate (%)',
+        color='ST Rate (%)',
+        color_continuous_scale='Oranges',
+        title='Step Therapy Rates'
+    )
+    fig.update_layout(showlegend=False, height=350)
+    return fig
+
+
+@st.cache_data
+def build_tier_chart(tier_dist: pd.DataFrame) -> go.Figure:
+    """Stacked tier distribution by product"""
+    fig = px.bar(
+        tier_dist,
+        x='product_name',
+        y='count',
+        color='tier',
+        title='Tier Distribution by Product',
+        labels={'product_name': 'Product', 'count': 'Number of Plans'},
+        barmode='stack'
+    )
+    fig.update_layout(height=400)
+    return fig
+
+
+@st.cache_data
+def coverage_csv(df: pd.DataFrame) -> str:
+    """Full dataset export, serialized once per dataset"""
+    return df.to_csv(index=False)
+
+
 # Custom CSS
 st.markdown("""
 <style>
@@ -73,20 +286,15 @@ with st.sidebar:
         if st.button("🚀 Extract Coverage Data"):
             if plan_file and formulary_file and cost_file:
                 with st.spinner("Extracting coverage data..."):
-                    # Save uploaded files
-                    temp_dir = Path("temp_upload")
-                    temp_dir.mkdir(exist_ok=True)
-                    
-                    (temp_dir / "plan_information.txt").write_bytes(plan_file.read())
-                    (temp_dir / "basic_drugs_formulary.txt").write_bytes(formulary_file.read())
-                    (temp_dir / "beneficiary_cost.txt").write_bytes(cost_file.read())
-                    
-                    # Run extraction
-                    extractor = GLP1CoverageExtractor(temp_dir)
-                    coverage_list = extractor.extract_coverage()
+                    # Run extraction (cached on file contents)
+                    coverage = load_uploaded(
+                        plan_file.getvalue(),
+                        formulary_file.getvalue(),
+                        cost_file.getvalue()
+                    )
                     
                     # Store in session state
-                    st.session_state['coverage_data'] = coverage_list
+                    st.session_state['coverage_data'] = coverage
                     st.session_state['data_loaded'] = True
                     st.success("✅ Extraction complete!")
             else:
@@ -97,9 +305,12 @@ with st.sidebar:
         if demo_path.exists():
             if st.button("📊 Load Demo Data"):
                 with st.spinner("Loading demo data..."):
-                    extractor = GLP1CoverageExtractor(demo_path)
-                    coverage_list = extractor.extract_coverage()
-                    st.session_state['coverage_data'] = coverage_list
+                    source_mtime = max(
+                        (demo_path / name).stat().st_mtime
+                        for name in (FORMULARY_FILE, COST_FILE, PLAN_INFO_FILE)
+                    )
+                    coverage = load_demo(str(demo_path), source_mtime)
+                    st.session_state['coverage_data'] = coverage
                     st.session_state['data_loaded'] = True
                     st.success("✅ Demo data loaded!")
         else:
@@ -108,8 +319,8 @@ with st.sidebar:
 # Main content
 if 'data_loaded' in st.session_state and st.session_state['data_loaded']:
     
-    # Convert to DataFrame
-    df = pd.DataFrame([vars(c) for c in st.session_state['coverage_data']])
+    # Extractor already returns a DataFrame
+    df = st.session_state['coverage_data']
     
     # Overview metrics
     st.header("📊 Overview")
@@ -151,31 +362,13 @@ if 'data_loaded' in st.session_state and st.session_state['data_loaded']:
     # Product comparison
     st.header("🏆 Product Comparison")
     
-    product_stats = df.groupby('product_name').agg({
-        'plan_id': 'count',
-        'access_score': 'mean',
-        'prior_auth': lambda x: (x.sum() / len(x)) * 100,
-        'step_therapy': lambda x: (x.sum() / len(x)) * 100,
-    }).round(1)
-    
-    product_stats.columns = ['Plans Covering', 'Avg Access Score', 'PA Rate (%)', 'ST Rate (%)']
-    product_stats = product_stats.sort_values('Avg Access Score', ascending=False)
+    product_summary = product_stats(df)
     
     # Access score chart
-    fig_access = px.bar(
-        product_stats.reset_index(),
-        x='product_name',
-        y='Avg Access Score',
-        color='Avg Access Score',
-        color_continuous_scale='RdYlGn',
-        title='Average Access Score by Product',
-        labels={'product_name': 'Product', 'Avg Access Score': 'Access Score (0-100)'}
-    )
-    fig_access.update_layout(showlegend=False, height=400)
-    st.plotly_chart(fig_access, use_container_width=True)
+    st.plotly_chart(build_access_chart(product_summary), use_container_width=True)
     
     # Product stats table
-    st.dataframe(product_stats, use_container_width=True)
+    st.dataframe(product_summary, use_container_width=True)
     
     st.markdown("---")
     
@@ -186,74 +379,25 @@ if 'data_loaded' in st.session_state and st.session_state['data_loaded']:
     
     with col1:
         # PA rates by product
-        pa_data = df.groupby('product_name')['prior_auth'].apply(
-            lambda x: (x.sum() / len(x)) * 100
-        ).reset_index()
-        pa_data.columns = ['Product', 'PA Rate (%)']
-        
-        fig_pa = px.bar(
-            pa_data,
-            x='Product',
-            y='PA Rate (%)',
-            color='PA Rate (%)',
-            color_continuous_scale='Reds',
-            title='Prior Authorization Rates'
-        )
-        fig_pa.update_layout(showlegend=False, height=350)
-        st.plotly_chart(fig_pa, use_container_width=True)
+        st.plotly_chart(build_pa_chart(pa_rates(df)), use_container_width=True)
     
     with col2:
         # ST rates by product
-        st_data = df.groupby('product_name')['step_therapy'].apply(
-            lambda x: (x.sum() / len(x)) * 100
-        ).reset_index()
-        st_data.columns = ['Product', 'ST Rate (%)']
-        
-        fig_st = px.bar(
-            st_data,
-            x='Product',
-            y='ST Rate (%)',
-            color='ST Rate (%)',
-            color_continuous_scale='Oranges',
-            title='Step Therapy Rates'
-        )
-        fig_st.update_layout(showlegend=False, height=350)
-        st.plotly_chart(fig_st, use_container_width=True)
+        st.plotly_chart(build_st_chart(st_rates(df)), use_container_width=True)
     
     st.markdown("---")
     
     # Tier distribution
     st.header("📊 Tier Distribution")
     
-    tier_dist = df.groupby(['product_name', 'tier']).size().reset_index(name='count')
-    
-    fig_tier = px.bar(
-        tier_dist,
-        x='product_name',
-        y='count',
-        color='tier',
-        title='Tier Distribution by Product',
-        labels={'product_name': 'Product', 'count': 'Number of Plans'},
-        barmode='stack'
-    )
-    fig_tier.update_layout(height=400)
-    st.plotly_chart(fig_tier, use_container_width=True)
+    st.plotly_chart(build_tier_chart(tier_distribution(df)), use_container_width=True)
     
     st.markdown("---")
     
     # Organization analysis
     st.header("🏢 Top Organizations")
     
-    org_stats = df.groupby('organization_name').agg({
-        'plan_id': 'count',
-        'access_score': 'mean',
-        'prior_auth': lambda x: (x.sum() / len(x)) * 100,
-    }).round(1)
-    
-    org_stats.columns = ['Coverage Records', 'Avg Access Score', 'PA Rate (%)']
-    org_stats = org_stats.sort_values('Coverage Records', ascending=False).head(10)
-    
-    st.dataframe(org_stats, use_container_width=True)
+    st.dataframe(org_stats(df), use_container_width=True)
     
     st.markdown("---")
     
@@ -265,33 +409,23 @@ if 'data_loaded' in st.session_state and st.session_state['data_loaded']:
     with col1:
         selected_org = st.selectbox(
             "Select Organization:",
-            options=['All'] + sorted(df['organization_name'].unique().tolist())
+            options=['All'] + df['organization_name'].cat.categories.tolist()
         )
     
     with col2:
         selected_product = st.selectbox(
             "Select Product:",
-            options=['All'] + sorted(df['product_name'].unique().tolist())
+            options=['All'] + df['product_name'].cat.categories.tolist()
         )
     
     # Filter data
-    filtered_df = df.copy()
-    if selected_org != 'All':
-        filtered_df = filtered_df[filtered_df['organization_name'] == selected_org]
-    if selected_product != 'All':
-        filtered_df = filtered_df[filtered_df['product_name'] == selected_product]
+    filtered_df = filter_coverage(df, selected_org, selected_product)
     
     # Display results
     st.write(f"**Showing {len(filtered_df)} plans**")
     
-    display_cols = [
-        'plan_name', 'product_name', 'tier', 
-        'prior_auth', 'step_therapy', 'quantity_limit',
-        'retail_preferred_cost', 'access_score'
-    ]
-    
     st.dataframe(
-        filtered_df[display_cols].sort_values('access_score', ascending=False),
+        filtered_df,
         use_container_width=True,
         height=400
     )
@@ -304,7 +438,7 @@ if 'data_loaded' in st.session_state and st.session_state['data_loaded']:
     col1, col2, col3 = st.columns(3)
     
     with col1:
-        csv_data = df.to_csv(index=False)
+        csv_data = coverage_csv(df)
         st.download_button(
             label="📥 Download Full Dataset (CSV)",
             data=csv_data,
@@ -321,7 +455,6 @@ if 'data_loaded' in st.session_state and st.session_state['data_loaded']:
             'st_rate': float((df['step_therapy'].sum() / len(df)) * 100),
         }
         
-        import json
         json_data = json.dumps(summary_stats, indent=2)
         
         st.download_button(
@@ -12,15 +12,19 @@ Output: Comprehensive coverage matrix with:
 - Affordability (copay/coinsurance by tier and pharmacy type)
 """
 
-import csv
 import zipfile
 import os
 from pathlib import Path
-from typing import Dict, List, Set, Tuple
-from dataclasses import dataclass, asdict
-from collections import defaultdict
+from typing import IO, Dict, List, Mapping, Set, Union
+from dataclasses import dataclass
 import json
 
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pacsv
+
 @dataclass
 class GLP1Product:
     """GLP-1 RA product definition"""
@@ -30,67 +34,99 @@ class GLP1Product:
     manufacturer: str  # Novo Nordisk or Eli Lilly
     ndcs: List[str]  # List of NDC codes for all strengths
 
-@dataclass
-class FormularyRecord:
-    """Individual formulary coverage record"""
-    contract_id: str
-    plan_id: str
-    ndc: str
-    tier: str
-    prior_auth: bool  # PA indicator
-    step_therapy: bool  # ST indicator
-    quantity_limit: bool  # QL indicator
-    
-@dataclass
-class BeneficiaryCostRecord:
-    """Cost-sharing details"""
-    contract_id: str
-    plan_id: str
-    tier: str
-    cost_type: str  # copay or coinsurance
-    retail_preferred_cost: float
-    retail_standard_cost: float
-    mail_order_cost: float
 
-@dataclass
-class PlanInfo:
-    """Plan identification"""
-    contract_id: str
-    plan_id: str
-    plan_name: str
-    plan_type: str  # PDP or MA-PD
-    organization_name: str
+# Version of the coverage output (columns, dtypes and scoring). Bump it
+# whenever any of these change so persisted extractions are rebuilt.
+COVERAGE_VERSION = 1
 
-@dataclass
-class CoverageAnalysis:
-    """Complete coverage analysis for one product in one plan"""
+# Complete coverage analysis: one row per product in one plan
+COVERAGE_COLUMNS = [
     # Plan identifiers
-    contract_id: str
-    plan_id: str
-    plan_name: str
-    plan_type: str
-    organization_name: str
+    'contract_id',
+    'plan_id',
+    'plan_name',
+    'plan_type',
+    'organization_name',
     
     # Product
-    product_name: str
-    molecule: str
-    indication: str
+    'product_name',
+    'molecule',
+    'indication',
     
     # Administrative Friction
-    covered: bool
-    tier: str
-    prior_auth: bool
-    step_therapy: bool
-    quantity_limit: bool
+    'covered',
+    'tier',
+    'prior_auth',
+    'step_therapy',
+    'quantity_limit',
     
-    # Affordability 
-    cost_type: str  # copay or coinsurance
-    retail_preferred_cost: float
-    retail_standard_cost: float
-    mail_order_cost: float
+    # Affordability
+    'cost_type',  # copay or coinsurance
+    'retail_preferred_cost',
+    'retail_standard_cost',
+    'mail_order_cost',
     
     # Composite Score (for ranking)
-    access_score: float  # 0-100, higher = better access
+    'access_score',  # 0-100, higher = better access
+]
+
+# Low-cardinality text columns stored as pandas Categoricals
+CATEGORY_COLUMNS = [
+    'product_name', 'tier', 'organization_name', 'plan_type',
+    'molecule', 'indication', 'cost_type'
+]
+
+# CMS input files expected by the extractor
+FORMULARY_FILE = "basic_drugs_formulary.txt"
+COST_FILE = "beneficiary_cost.txt"
+PLAN_INFO_FILE = "plan_information.txt"
+
+# A CMS file on disk or already in memory (e.g. io.BytesIO of an upload).
+# Either kind is read in the calling process; nothing is copied to workers.
+DataSource = Union[Path, IO[bytes]]
+
+PLAN_KEY = ['contract_id', 'plan_id']
+COST_KEY = ['contract_id', 'plan_id', 'tier']
+
+
+def read_pipe_table(source: DataSource, columns: List[str]) -> pa.Table:
+    """
+    Read selected columns of a pipe-delimited CMS file with PyArrow's
+    multi-threaded CSV reader
+    
+    All columns are read as strings; blank fields stay empty strings.
+    """
+    return pacsv.read_csv(
+        source,
+        parse_options=pacsv.ParseOptions(delimiter='|'),
+        convert_options=pacsv.ConvertOptions(
+            include_columns=columns,
+            column_types={column: pa.string() for column in columns},
+            strings_can_be_null=False
+        )
+    )
+
+
+def normalize_ndcs(ndc: pa.ChunkedArray) -> pa.ChunkedArray:
+    """
+    Normalize NDCs to 11-digit format without dashes
+    
+    Handles both formats:
+    - 5-4-2 format: 00169-4517-01 -> 00169451701
+    - 11-digit: 00169451701 -> 00169451701
+    
+    Dash-free 11-character values (the common case) are kept as-is; all
+    others have every dash removed and are left-padded with zeros to 11
+    digits (shorter values shouldn't happen with valid NDCs).
+    """
+    return pc.if_else(
+        pc.and_(
+            pc.equal(pc.utf8_length(ndc), 11),
+            pc.invert(pc.match_substring(ndc, '-'))
+        ),
+        ndc,
+        pc.utf8_lpad(pc.replace_substring(ndc, '-', ''), 11, '0')
+    )
 
 
 class GLP1CoverageExtractor:
@@ -128,14 +164,23 @@ class GLP1CoverageExtractor:
         ),
     ]
     
-    def __init__(self, data_dir: Path):
+    def __init__(self, data: Union[Path, Mapping[str, DataSource]]):
         """
         Initialize extractor
         
         Args:
-            data_dir: Directory containing extracted CMS formulary files
+            data: Directory containing extracted CMS formulary files, or a
+                mapping of CMS file name (FORMULARY_FILE, COST_FILE,
+                PLAN_INFO_FILE) to a path or binary file-like object
         """
-        self.data_dir = Path(data_dir)
+        if isinstance(data, Mapping):
+            self.sources: Dict[str, DataSource] = dict(data)
+        else:
+            data_dir = Path(data)
+            self.sources = {
+                name: data_dir / name
+                for name in (FORMULARY_FILE, COST_FILE, PLAN_INFO_FILE)
+            }
         self.products = {p.name: p for p in self.PRODUCTS}
         
         # Build NDC -> Product mapping
@@ -146,25 +191,7 @@ class GLP1CoverageExtractor:
                 normalized = ndc.replace("-", "")
                 self.ndc_to_product[normalized] = product.name
     
-    def normalize_ndc(self, ndc: str) -> str:
-        """
-        Normalize NDC to 11-digit format without dashes
-        
-        Handles both formats:
-        - 5-4-2 format: 00169-4517-01 -> 00169451701
-        - 11-digit: 00169451701 -> 00169451701
-        """
-        # Remove all dashes first
-        ndc_clean = ndc.replace("-", "")
-        
-        # If already 11 digits, return as-is
-        if len(ndc_clean) == 11:
-            return ndc_clean
-        
-        # If shorter, pad to 11 digits (shouldn't happen with valid NDCs)
-        return ndc_clean.zfill(11)
-    
-    def parse_formulary_file(self, filepath: Path) -> List[FormularyRecord]:
+    def parse_formulary_file(self, source: DataSource) -> pd.DataFrame:
         """
         Parse Basic Drugs Formulary file
         
@@ -176,31 +203,32 @@ class GLP1CoverageExtractor:
         - Prior_Authorization (Y/N)
         - Step_Therapy (Y/N)
         - Quantity_Limit (Y/N)
-        """
-        records = []
         
-        with open(filepath, 'r', encoding='utf-8') as f:
-            reader = csv.DictReader(f, delimiter='|')
-            
-            for row in reader:
-                # Normalize NDC and check if it's a GLP-1
-                ndc = self.normalize_ndc(row.get('NDC', ''))
-                
-                if ndc in self.ndc_to_product:
-                    record = FormularyRecord(
-                        contract_id=row.get('Contract_ID', ''),
-                        plan_id=row.get('Plan_ID', ''),
-                        ndc=ndc,
-                        tier=row.get('Tier', ''),
-                        prior_auth=row.get('Prior_Authorization', 'N').upper() == 'Y',
-                        step_therapy=row.get('Step_Therapy', 'N').upper() == 'Y',
-                        quantity_limit=row.get('Quantity_Limit', 'N').upper() == 'Y'
-                    )
-                    records.append(record)
-        
-        return records
+        Returns: DataFrame of GLP-1 rows only (contract_id, plan_id, ndc,
+        tier, prior_auth, step_therapy, quantity_limit)
+        """
+        table = read_pipe_table(source, [
+            'Contract_ID', 'Plan_ID', 'NDC', 'Tier',
+            'Prior_Authorization', 'Step_Therapy', 'Quantity_Limit'
+        ])
+        
+        # Normalize NDC and keep only GLP-1 rows, all inside Arrow so the
+        # non-GLP-1 majority never becomes Python objects
+        ndc = normalize_ndcs(table['NDC'])
+        is_glp1 = pc.is_in(ndc, value_set=pa.array(sorted(self.ndc_to_product), pa.string()))
+        df = table.filter(is_glp1).to_pandas()
+        
+        return pd.DataFrame({
+            'contract_id': df['Contract_ID'],
+            'plan_id': df['Plan_ID'],
+            'ndc': ndc.filter(is_glp1).to_pandas(),
+            'tier': df['Tier'],
+            'prior_auth': (df['Prior_Authorization'].str.upper() == 'Y').to_numpy(),
+            'step_therapy': (df['Step_Therapy'].str.upper() == 'Y').to_numpy(),
+            'quantity_limit': (df['Quantity_Limit'].str.upper() == 'Y').to_numpy(),
+        }).reset_index(drop=True)
     
-    def parse_cost_file(self, filepath: Path) -> List[BeneficiaryCostRecord]:
+    def parse_cost_file(self, source: DataSource) -> pd.DataFrame:
         """
         Parse Beneficiary Cost file
         
@@ -213,55 +241,71 @@ class GLP1CoverageExtractor:
         - Retail_Standard_Cost  
         - Mail_Order_Cost
         """
-        records = []
-        
-        with open(filepath, 'r', encoding='utf-8') as f:
-            reader = csv.DictReader(f, delimiter='|')
+        df = read_pipe_table(source, [
+            'Contract_ID', 'Plan_ID', 'Tier', 'Cost_Type',
+            'Retail_Preferred_Cost', 'Retail_Standard_Cost', 'Mail_Order_Cost'
+        ]).to_pandas()
+        
+        costs = {}
+        valid = pd.Series(True, index=df.index)
+        for column, name in [
+            ('Retail_Preferred_Cost', 'retail_preferred_cost'),
+            ('Retail_Standard_Cost', 'retail_standard_cost'),
+            ('Mail_Order_Cost', 'mail_order_cost'),
+        ]:
+            # Blank cost means 0
+            values = df[column].where(df[column] != '', '0')
+            parsed = pd.to_numeric(values, errors='coerce')
             
-            for row in reader:
+            # to_numeric also gives NaN for text float() accepts (e.g. 'nan',
+            # '1_000'), so retry just those with float(); only values float()
+            # rejects make the record malformed
+            for i, value in values[parsed.isna()].items():
                 try:
-                    record = BeneficiaryCostRecord(
-                        contract_id=row.get('Contract_ID', ''),
-                        plan_id=row.get('Plan_ID', ''),
-                        tier=row.get('Tier', ''),
-                        cost_type=row.get('Cost_Type', '').lower(),
-                        retail_preferred_cost=float(row.get('Retail_Preferred_Cost', 0) or 0),
-                        retail_standard_cost=float(row.get('Retail_Standard_Cost', 0) or 0),
-                        mail_order_cost=float(row.get('Mail_Order_Cost', 0) or 0)
-                    )
-                    records.append(record)
-                except (ValueError, TypeError):
-                    # Skip malformed cost records
-                    continue
-        
-        return records
+                    parsed[i] = float(value)
+                except ValueError:
+                    valid[i] = False
+            costs[name] = parsed
+        
+        costs = pd.DataFrame(costs)
+        
+        # Skip malformed cost records
+        df = df[valid]
+        
+        return pd.concat([
+            pd.DataFrame({
+                'contract_id': df['Contract_ID'],
+                'plan_id': df['Plan_ID'],
+                'tier': df['Tier'],
+                'cost_type': df['Cost_Type'].str.lower(),
+            }),
+            costs[valid].astype(float),
+        ], axis=1).reset_index(drop=True)
     
-    def parse_plan_info_file(self, filepath: Path) -> Dict[Tuple[str, str], PlanInfo]:
+    def parse_plan_info_file(self, source: DataSource) -> pd.DataFrame:
         """
         Parse Plan Information file
         
-        Returns: Dict mapping (contract_id, plan_id) -> PlanInfo
+        Returns: DataFrame with one row per (contract_id, plan_id)
         """
-        plans = {}
-        
-        with open(filepath, 'r', encoding='utf-8') as f:
-            reader = csv.DictReader(f, delimiter='|')
-            
-            for row in reader:
-                key = (row.get('Contract_ID', ''), row.get('Plan_ID', ''))
-                plans[key] = PlanInfo(
-                    contract_id=row.get('Contract_ID', ''),
-                    plan_id=row.get('Plan_ID', ''),
-                    plan_name=row.get('Plan_Name', ''),
-                    plan_type=row.get('Plan_Type', ''),
-                    organization_name=row.get('Organization_Name', '')
-                )
-        
-        return plans
+        df = read_pipe_table(source, [
+            'Contract_ID', 'Plan_ID', 'Plan_Name', 'Plan_Type', 'Organization_Name'
+        ]).to_pandas()
+        
+        plans = df.rename(columns={
+            'Contract_ID': 'contract_id',
+            'Plan_ID': 'plan_id',
+            'Plan_Name': 'plan_name',
+            'Plan_Type': 'plan_type',
+            'Organization_Name': 'organization_name',
+        })[['contract_id', 'plan_id', 'plan_name', 'plan_type', 'organization_name']]
+        
+        # Later rows win for duplicate plan keys
+        return plans.drop_duplicates(PLAN_KEY, keep='last').reset_index(drop=True)
     
-    def calculate_access_score(self, coverage: CoverageAnalysis) -> float:
+    def calculate_access_scores(self, coverage: pd.DataFrame) -> np.ndarray:
         """
-        Calculate composite access score (0-100)
+        Calculate composite access score (0-100) for every coverage row
         
         Higher score = better access
         
@@ -274,132 +318,112 @@ class GLP1CoverageExtractor:
         - Cost (copay): <$50=+10, $50-100=+5, >$100=+0
         - Cost (coinsurance): <25%=+10, 25-33%=+5, >33%=+0
         """
-        if not coverage.covered:
-            return 0.0
-        
-        score = 0.0
-        
         # Tier scoring
         tier_scores = {
             '1': 40, '2': 35, '3': 30, '4': 25, '5': 20, '6': 15,
             'Specialty': 10, 'ST': 10
         }
-        score += tier_scores.get(coverage.tier, 10)
+        # Score each distinct tier once, then gather by integer tier code.
+        # take() returns a new, writable array; the in-place += below must
+        # never touch a (possibly read-only, under Copy-on-Write) pandas view.
+        tier_codes, tiers = pd.factorize(coverage['tier'])
+        tier_table = np.array([tier_scores.get(tier, 10) for tier in tiers], dtype=float)
+        score = tier_table.take(tier_codes)
         
         # Utilization management
-        if not coverage.prior_auth:
-            score += 20
-        if not coverage.step_therapy:
-            score += 20
-        if not coverage.quantity_limit:
-            score += 10
+        score += (~coverage['prior_auth'].to_numpy()) * 20
+        score += (~coverage['step_therapy'].to_numpy()) * 20
+        score += (~coverage['quantity_limit'].to_numpy()) * 10
         
         # Cost scoring (using retail preferred as reference)
-        if coverage.cost_type == 'copay':
-            if coverage.retail_preferred_cost < 50:
-                score += 10
-            elif coverage.retail_preferred_cost < 100:
-                score += 5
-        elif coverage.cost_type == 'coinsurance':
-            if coverage.retail_preferred_cost < 25:
-                score += 10
-            elif coverage.retail_preferred_cost < 33:
-                score += 5
-        
-        return min(score, 100.0)
+        cost = coverage['retail_preferred_cost'].to_numpy()
+        cost_type = coverage['cost_type'].to_numpy()
+        score += np.select(
+            [cost_type == 'copay', cost_type == 'coinsurance'],
+            [
+                np.where(cost < 50, 10, np.where(cost < 100, 5, 0)),
+                np.where(cost < 25, 10, np.where(cost < 33, 5, 0)),
+            ],
+            default=0
+        )
+        
+        score = np.minimum(score, 100.0)
+        return np.where(coverage['covered'].to_numpy(), score, 0.0)
     
-    def extract_coverage(self) -> List[CoverageAnalysis]:
+    def extract_coverage(self) -> pd.DataFrame:
         """
         Main extraction method
         
-        Returns: List of CoverageAnalysis records for all GLP-1s across all plans
+        Returns: DataFrame with one row per GLP-1 product per plan
+        (columns as in COVERAGE_COLUMNS)
         """
         print("Starting GLP-1 coverage extraction...")
         
-        # Load all data files
+        # Load all data files (PyArrow already parses each one multi-threaded)
         print("Loading formulary data...")
-        formulary_records = self.parse_formulary_file(
-            self.data_dir / "basic_drugs_formulary.txt"
-        )
-        print(f"  Found {len(formulary_records)} GLP-1 formulary records")
+        formulary = self.parse_formulary_file(self.sources[FORMULARY_FILE])
+        print(f"  Found {len(formulary)} GLP-1 formulary records")
         
         print("Loading cost data...")
-        cost_records = self.parse_cost_file(
-            self.data_dir / "beneficiary_cost.txt"
-        )
-        print(f"  Loaded {len(cost_records)} cost records")
+        cost = self.parse_cost_file(self.sources[COST_FILE])
+        print(f"  Loaded {len(cost)} cost records")
         
         print("Loading plan information...")
-        plan_info = self.parse_plan_info_file(
-            self.data_dir / "plan_information.txt"
-        )
+        plan_info = self.parse_plan_info_file(self.sources[PLAN_INFO_FILE])
         print(f"  Loaded {len(plan_info)} plans")
         
-        # Build cost lookup: (contract_id, plan_id, tier) -> cost record
-        cost_lookup = {}
-        for cost in cost_records:
-            key = (cost.contract_id, cost.plan_id, cost.tier)
-            cost_lookup[key] = cost
-        
-        # Process coverage
-        coverage_list = []
+        # Product attributes keyed by normalized NDC
+        products = pd.DataFrame(
+            [
+                (ndc, name, self.products[name].molecule, self.products[name].indication)
+                for ndc, name in self.ndc_to_product.items()
+            ],
+            columns=['ndc', 'product_name', 'molecule', 'indication']
+        )
         
-        for form_rec in formulary_records:
-            # Get plan info
-            plan_key = (form_rec.contract_id, form_rec.plan_id)
-            plan = plan_info.get(plan_key)
-            
-            if not plan:
-                continue  # Skip if plan info not found
-            
-            # Get cost info
-            cost_key = (form_rec.contract_id, form_rec.plan_id, form_rec.tier)
-            cost = cost_lookup.get(cost_key)
-            
-            # Get product
-            product_name = self.ndc_to_product.get(form_rec.ndc)
-            if not product_name:
-                continue
-            
-            product = self.products[product_name]
-            
-            # Build coverage analysis
-            coverage = CoverageAnalysis(
-                contract_id=form_rec.contract_id,
-                plan_id=form_rec.plan_id,
-                plan_name=plan.plan_name,
-                plan_type=plan.plan_type,
-                organization_name=plan.organization_name,
-                product_name=product.name,
-                molecule=product.molecule,
-                indication=product.indication,
-                covered=True,
-                tier=form_rec.tier,
-                prior_auth=form_rec.prior_auth,
-                step_therapy=form_rec.step_therapy,
-                quantity_limit=form_rec.quantity_limit,
-                cost_type=cost.cost_type if cost else 'unknown',
-                retail_preferred_cost=cost.retail_preferred_cost if cost else 0.0,
-                retail_standard_cost=cost.retail_standard_cost if cost else 0.0,
-                mail_order_cost=cost.mail_order_cost if cost else 0.0,
-                access_score=0.0  # Calculate below
+        # Join: rows without plan info are dropped, missing cost is allowed.
+        # Later cost rows win for duplicate (contract_id, plan_id, tier) keys,
+        # so each lookup side is unique and the joins never fan out rows.
+        # Every join is a left join so rows keep formulary-file order on
+        # all pandas versions (inner joins reorder by key before 2.2).
+        coverage = formulary.merge(
+            plan_info, on=PLAN_KEY, how='left', validate='many_to_one', indicator=True
+        )
+        coverage = coverage[coverage.pop('_merge') == 'both']
+        coverage = (
+            coverage
+            .merge(products, on='ndc', how='left', validate='many_to_one')
+            .merge(
+                cost.drop_duplicates(COST_KEY, keep='last'),
+                on=COST_KEY, how='left', validate='many_to_one'
             )
-            
-            # Calculate access score
-            coverage.access_score = self.calculate_access_score(coverage)
-            
-            coverage_list.append(coverage)
+        )
         
-        print(f"\nExtracted {len(coverage_list)} coverage records")
+        coverage['covered'] = True
+        # Defaults only for rows with no cost match (cost_type is never
+        # missing in a parsed cost row); a parsed 'nan' cost stays NaN
+        no_cost = coverage['cost_type'].isna()
+        coverage.loc[no_cost, 'cost_type'] = 'unknown'
+        coverage.loc[no_cost, ['retail_preferred_cost', 'retail_standard_cost', 'mail_order_cost']] = 0.0
         
-        return coverage_list
+        # Calculate access score
+        coverage['access_score'] = self.calculate_access_scores(coverage)
+        
+        for column in CATEGORY_COLUMNS:
+            coverage[column] = coverage[column].astype('category')
+        
+        coverage = coverage[COVERAGE_COLUMNS]
+        
+        print(f"\nExtracted {len(coverage)} coverage records")
+        
+        return coverage
     
-    def generate_summary_stats(self, coverage_list: List[CoverageAnalysis]) -> Dict:
+    def generate_summary_stats(self, coverage: pd.DataFrame) -> Dict:
         """Generate summary statistics"""
         
         stats = {
-            'total_records': len(coverage_list),
-            'unique_plans': len(set((c.contract_id, c.plan_id) for c in coverage_list)),
+            'total_records': len(coverage),
+            'unique_plans': len(coverage[PLAN_KEY].drop_duplicates()),
             'by_product': {},
             'by_indication': {},
             'by_molecule': {},
@@ -408,34 +432,41 @@ class GLP1CoverageExtractor:
                 'step_therapy_pct': 0,
                 'quantity_limit_pct': 0
             },
-            'tier_distribution': defaultdict(int),
+            'tier_distribution': {},
             'average_access_score': 0.0
         }
         
-        if not coverage_list:
+        if coverage.empty:
             return stats
         
-        # By product
-        for product_name in self.products.keys():
-            product_records = [c for c in coverage_list if c.product_name == product_name]
-            stats['by_product'][product_name] = {
-                'total_plans': len(set((c.contract_id, c.plan_id) for c in product_records)),
-                'avg_access_score': sum(c.access_score for c in product_records) / len(product_records) if product_records else 0,
-                'pa_rate': sum(1 for c in product_records if c.prior_auth) / len(product_records) * 100 if product_records else 0,
-                'st_rate': sum(1 for c in product_records if c.step_therapy) / len(product_records) * 100 if product_records else 0
-            }
+        # By product, in one grouped pass
+        by_product = coverage.groupby('product_name', observed=True).agg(
+            avg_access_score=('access_score', 'mean'),
+            pa_rate=('prior_auth', 'mean'),
+            st_rate=('step_therapy', 'mean'),
+        )
+        by_product[['pa_rate', 'st_rate']] *= 100
+        by_product.insert(0, 'total_plans', (
+            coverage.drop_duplicates(['product_name'] + PLAN_KEY)['product_name']
+            .value_counts()
+        ))
+        by_product = by_product.reindex(list(self.products), fill_value=0)
+        stats['by_product'] = by_product.to_dict('index')
         
         # Administrative friction
-        stats['administrative_friction']['prior_auth_pct'] = sum(1 for c in coverage_list if c.prior_auth) / len(coverage_list) * 100
-        stats['administrative_friction']['step_therapy_pct'] = sum(1 for c in coverage_list if c.step_therapy) / len(coverage_list) * 100
-        stats['administrative_friction']['quantity_limit_pct'] = sum(1 for c in coverage_list if c.quantity_limit) / len(coverage_list) * 100
+        friction = coverage[['prior_auth', 'step_therapy', 'quantity_limit']].mean() * 100
+        stats['administrative_friction'] = {
+            'prior_auth_pct': float(friction['prior_auth']),
+            'step_therapy_pct': float(friction['step_therapy']),
+            'quantity_limit_pct': float(friction['quantity_limit'])
+        }
         
         # Tier distribution
-        for c in coverage_list:
-            stats['tier_distribution'][c.tier] += 1
+        for tier, count in coverage['tier'].value_counts(sort=False).items():
+            stats['tier_distribution'][tier] = int(count)
         
         # Average access score
-        stats['average_access_score'] = sum(c.access_score for c in coverage_list) / len(coverage_list)
+        stats['average_access_score'] = float(coverage['access_score'].mean())
         
         return stats
 
@@ -460,14 +491,14 @@ def main():
     
     # Run extraction
     extractor = GLP1CoverageExtractor(data_dir)
-    coverage_list = extractor.extract_coverage()
+    coverage = extractor.extract_coverage()
     
     # Generate stats
     print("\n" + "="*80)
     print("SUMMARY STATISTICS")
     print("="*80)
     
-    stats = extractor.generate_summary_stats(coverage_list)
+    stats = extractor.generate_summary_stats(coverage)
     
     print(f"\nTotal Coverage Records: {stats['total_records']}")
     print(f"Unique Plans: {stats['unique_plans']}")
@@ -495,21 +526,12 @@ def main():
     output_file = data_dir / "glp1_coverage_analysis.csv"
     print(f"\nExporting detailed results to: {output_file}")
     
-    with open(output_file, 'w', newline='') as f:
-        if coverage_list:
-            fieldnames = list(asdict(coverage_list[0]).keys())
-            writer = csv.DictWriter(f, fieldnames=fieldnames)
-            writer.writeheader()
-            for coverage in coverage_list:
-                writer.writerow(asdict(coverage))
+    coverage.to_csv(output_file, index=False, na_rep='nan', lineterminator='\r\n')
     
     # Export summary stats to JSON
     stats_file = data_dir / "glp1_summary_stats.json"
     with open(stats_file, 'w') as f:
-        # Convert defaultdict to regular dict for JSON serialization
-        stats_copy = dict(stats)
-        stats_copy['tier_distribution'] = dict(stats['tier_distribution'])
-        json.dump(stats_copy, f, indent=2)
+        json.dump(stats, f, indent=2)
     
     print(f"Summary statistics exported to: {stats_file}")
     print("\nExtraction complete!")